@@ -1,10 +1,18 @@
+import os
+
 import gradio as gr
 from PIL import Image
 
+# Number of "Generate" requests processed at once; further clicks wait in the queue.
+# Override by setting GRADIO_CONCURRENCY in the process environment (.env is not read).
+GRADIO_CONCURRENCY = int(os.getenv("GRADIO_CONCURRENCY", "4"))
+
 # Define the function that will be called when the "Generate" button is clicked.
 # This function takes the user's inputs and returns the output.
 # For this example, it simply returns the uploaded image.
-def generate_image(input_image, location, year):
+# It is a coroutine, so Gradio runs it on its event loop rather than a worker
+# thread; any blocking work added here must be awaited or moved to a thread.
+async def generate_image(input_image, location, year):
     """
     Processes the inputs and generates an output image.
     
@@ -53,7 +61,8 @@ with gr.Blocks() as demo:
         outputs=image_output
     )
 
-# Launch the Gradio interface.
+# Launch the Gradio interface behind a bounded queue so concurrent clicks are
+# served in order instead of all hitting the backend at once.
 if __name__ == "__main__":
-    demo.launch()
+    demo.queue(max_size=64, default_concurrency_limit=GRADIO_CONCURRENCY).launch()
     print("Gradio interface launched. Visit the provided URL to interact with the app.")
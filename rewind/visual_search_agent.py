@@ -1,9 +1,15 @@
 from serpapi.google_search import GoogleSearch
 from dotenv import load_dotenv
+from copy import deepcopy
+from functools import lru_cache
 import os
-from openai import OpenAI
+from openai import AsyncOpenAI, BadRequestError
 import asyncio
+import logging
 import requests
+from requests.adapters import HTTPAdapter
+import time
+import weakref
 
 from agents import enable_verbose_stdout_logging
 enable_verbose_stdout_logging()
@@ -15,24 +21,70 @@ from agents import (
     WebSearchTool,
 )
 
+logger = logging.getLogger(__name__)
+
 load_dotenv()
 SERP_API_KEY = os.getenv("SERP_API_KEY")
-openai_client = OpenAI()
-
-def describe_all_images(images_results):
-    descriptions = []
-    for image in images_results:
-        description = describe_thumbnail(image["thumbnail"])
-        descriptions.append({
+# Retries (after the first attempt) the OpenAI SDK makes on 408/409/429/5xx responses,
+# timeouts and connection errors, backing off exponentially with jitter between them.
+OPENAI_MAX_RETRIES = 4
+# Maximum seconds a cached Wikipedia summary is reused before being fetched again.
+WIKIPEDIA_CACHE_TTL = 24 * 60 * 60
+# Seconds before a Wikipedia request gives up, so a stalled connection cannot hold
+# a worker thread indefinitely.
+WIKIPEDIA_TIMEOUT = 8
+# Maximum seconds a cached Google Images search is reused before being run again.
+IMAGE_SEARCH_CACHE_TTL = 60 * 60
+# Number of image search results described by the vision model per search.
+MAX_DESCRIBED_IMAGES = 5
+
+# Keep-alive session shared by all Wikipedia requests, so the TCP+TLS handshake
+# is paid once rather than on every search and summary call.
+wikipedia_session = requests.Session()
+wikipedia_session.headers["User-Agent"] = "RewindApp/1.0"
+wikipedia_session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32))
+
+# AsyncOpenAI's pooled connections belong to the event loop that opened them, so
+# keep one client per running loop; it is dropped when its loop is garbage-collected.
+_openai_clients = weakref.WeakKeyDictionary()
+
+def get_openai_client():
+    """Return the async OpenAI client shared by all callers on the running loop."""
+    loop = asyncio.get_running_loop()
+    client = _openai_clients.get(loop)
+    if client is None:
+        client = _openai_clients[loop] = AsyncOpenAI(max_retries=OPENAI_MAX_RETRIES)
+    return client
+
+async def describe_all_images(images_results):
+    images = images_results[:MAX_DESCRIBED_IMAGES]
+    # Describe the thumbnails concurrently; total latency is that of the slowest call.
+    descriptions = await asyncio.gather(
+        *(describe_thumbnail(image["thumbnail"]) for image in images),
+        return_exceptions=True,
+    )
+    results = []
+    skipped = []
+    for image, description in zip(images, descriptions):
+        # A thumbnail OpenAI rejects (e.g. it cannot be fetched) is skipped; any other
+        # error, such as a missing API key, is not specific to the image and is raised.
+        if isinstance(description, BadRequestError):
+            logger.warning("Skipping thumbnail %s: %s", image["thumbnail"], description)
+            skipped.append(description)
+            continue
+        if isinstance(description, BaseException):
+            raise description
+        results.append({
             "title": image["title"],
             "link": image["link"],
             "description": description
         })
-        break
-    return descriptions
+    if skipped and not results:
+        raise skipped[0]
+    return results
 
-def describe_thumbnail(image_url):
-    response = openai_client.responses.create(
+async def describe_thumbnail(image_url):
+    response = await get_openai_client().responses.create(
         model="gpt-4.1",
         input=[{
             "role": "user",
@@ -41,13 +93,33 @@ def describe_thumbnail(image_url):
                 {
                     "type": "input_image",
                     "image_url": image_url,
+                    # Thumbnails are small; low detail processes them at 512px
+                    # for a fixed, minimal number of image tokens.
+                    "detail": "low",
                 },
             ],
         }],
     )
     return response.output_text + "\n"
 
+def _normalize_query(query):
+    # Collapse case and whitespace so equivalent queries share one cache entry.
+    return " ".join(query.lower().split())
+
+def _ttl_bucket(ttl):
+    # Passed as an extra lru_cache key: when the bucket rolls over, cached entries stop
+    # matching, so each is reused for at most `ttl` seconds. Entries from past buckets
+    # stay in the LRU until they are evicted.
+    return int(time.monotonic() // ttl)
+
 def search_google(item_to_find: str):
+    query = _normalize_query(item_to_find)
+    # Hand out a copy so callers that mutate the results cannot corrupt the cache.
+    return deepcopy(_search_google(query, _ttl_bucket(IMAGE_SEARCH_CACHE_TTL)))
+
+@lru_cache(maxsize=256)
+def _search_google(item_to_find, ttl_bucket):
+    """Run a SerpAPI Google Images search for a normalized query."""
     params = {
     "engine": "google_images_light",
     "q": item_to_find,
@@ -67,7 +139,7 @@ def search_google(item_to_find: str):
     return raw_results 
 
 @function_tool  
-def seach_google_for_images(item_to_find: str) -> list:
+async def seach_google_for_images(item_to_find: str) -> list:
     """
     Search Google Images for a given item and return a list of image results, with links and descriptions.
 
@@ -77,39 +149,58 @@ def seach_google_for_images(item_to_find: str) -> list:
     Returns:
         list: A list of dictionaries, each containing the image title, link, and a description generated by the image analysis.
     """
-    raw_results = search_google(item_to_find)
-    results_w_description = describe_all_images(raw_results)
+    # The SerpAPI client is blocking, so run it in a worker thread.
+    raw_results = await asyncio.to_thread(search_google, item_to_find)
+    results_w_description = await describe_all_images(raw_results)
     return results_w_description
 
-@function_tool
-def wikipedia_lookup(query):
-    """
-    Look up a query on Wikipedia and return the summary extract of the most relevant page.
-
-    Args:
-        query (str): The search term to look up on Wikipedia.
-
-    Returns:
-        str: The summary extract of the most relevant Wikipedia page, or a message if no page is found.
-    """
+@lru_cache(maxsize=1024)
+def _fetch_wikipedia_summary(query, ttl_bucket):
+    """Return the best Wikipedia match's summary extract, or None if nothing matches."""
     # Step 1: Search
     search_url = "https://en.wikipedia.org/w/rest.php/v1/search/title"
     params = {"q": query, "limit": 1}
-    search_resp = requests.get(search_url, params=params)
+    search_resp = wikipedia_session.get(
+        search_url, params=params, timeout=WIKIPEDIA_TIMEOUT
+    )
     search_resp.raise_for_status()
     search_data = search_resp.json()
     
     if not search_data.get("pages"):
-        return f"No Wikipedia page found for '{query}'"
+        return None
     
     page_key = search_data["pages"][0]["key"]
     
     # Step 2: Fetch summary
     summary_url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{page_key}"
-    summary_resp = requests.get(summary_url)
+    summary_resp = wikipedia_session.get(summary_url, timeout=WIKIPEDIA_TIMEOUT)
     summary_resp.raise_for_status()
     return summary_resp.json().get("extract")
 
+@function_tool
+async def wikipedia_lookup(query):
+    """
+    Look up a query on Wikipedia and return the summary extract of the most relevant page.
+
+    Args:
+        query (str): The search term to look up on Wikipedia.
+
+    Returns:
+        str: The summary extract of the most relevant Wikipedia page, or a message if no page is found.
+    """
+    cache_key = _normalize_query(query)
+    if not cache_key:
+        return "No Wikipedia page found for an empty query"
+
+    # The requests are blocking; run them in a worker thread so parallel tool
+    # calls from the agent overlap instead of queuing on the event loop.
+    extract = await asyncio.to_thread(
+        _fetch_wikipedia_summary, cache_key, _ttl_bucket(WIKIPEDIA_CACHE_TTL)
+    )
+    if extract is None:
+        return f"No Wikipedia page found for '{query}'"
+    return extract
+
 
 agent = Agent(
     name="Visual Search Agent",
@@ -132,6 +223,6 @@ if __name__ == "__main__":
 # if __name__ == "__main__":
 #     item_to_find = "mediterranean houses in the 16h century"
 #     results = search_google(item_to_find)
-#     desc = describe_all_images(results)
+#     desc = asyncio.run(describe_all_images(results))
 #     print(desc[0])
 #     # print(wikipedia_lookup("United States Constitution"))